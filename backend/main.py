@@ -1,172 +1,444 @@
-from typing import Optional
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from typing import Literal, Optional
+from fastapi import FastAPI, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 import asyncio
+import hashlib
 import json
-try:
-    from simulation import SimulationEngine
-except ImportError:
-    from backend.simulation import SimulationEngine
+import msgpack
+import orjson
+from .simulation import ATTACK_TYPES, PARAM_NAMES, SimulationEngine
 
-app = FastAPI()
+class OrjsonResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib encoder"""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+app = FastAPI(default_response_class=OrjsonResponse)
+
+# Only the dashboard origins are allowed; explicit lists let Starlette
+# pre-build the preflight headers instead of echoing them per request.
+# CORS does not apply to the /ws route, so widening this to "*" gains nothing.
+CORS_ORIGINS = ("http://localhost:3000", "https://suray.raxa2.store")
+CORS_METHODS = ("GET", "POST")
+CORS_HEADERS = ("content-type",)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=CORS_METHODS,
+    allow_headers=CORS_HEADERS,
 )
 
 simulation = SimulationEngine()
 
+# Every engine call runs on this single worker thread: stepping and frame
+# encoding stay off the event loop, and control requests never interleave
+# with a step in progress
+sim_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="simulation")
+
+async def run_in_sim(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(sim_executor, fn, *args)
+
 # Request models
+AttackType = Literal[tuple(ATTACK_TYPES)]
+Sophistication = Literal["low", "medium", "high"]
+
 class AttackRequest(BaseModel):
-    type: Optional[str] = None
-    sophistication: str = "medium"  # low, medium, high
+    type: Optional[AttackType] = None
+    sophistication: Sophistication = "medium"
 
 class ParamsUpdate(BaseModel):
-    params: dict
+    params: dict[str, float]
 
 class VehicleUpdate(BaseModel):
     vehicle_id: str
     updates: dict
 
+class CachedJSON:
+    """A constant JSON body encoded once, served with an ETag so browsers can revalidate"""
+
+    def __init__(self, content):
+        self.body = orjson.dumps(content)
+        self.etag = '"%s"' % hashlib.blake2b(self.body, digest_size=16).hexdigest()
+
+    def response(self, request: Request) -> Response:
+        headers = {"ETag": self.etag}
+        if request.headers.get("if-none-match") == self.etag:
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+ROOT_RESPONSE = CachedJSON({"message": "V2X Security Simulation API"})
+
 @app.get("/")
-async def root():
-    return {"message": "V2X Security Simulation API"}
+async def root(request: Request):
+    return ROOT_RESPONSE.response(request)
 
 @app.post("/control/start")
 async def start_simulation():
-    simulation.start()
+    await run_in_sim(simulation.start)
     return {"status": "started"}
 
 @app.post("/control/stop")
 async def stop_simulation():
-    simulation.stop()
+    await run_in_sim(simulation.stop)
     return {"status": "stopped"}
 
 @app.post("/control/reset")
 async def reset_simulation():
-    simulation.reset()
+    await run_in_sim(simulation.reset)
     return {"status": "reset"}
 
 @app.post("/control/attack")
 async def set_attack(request: AttackRequest):
-    simulation.set_attack(request.type, request.sophistication)
+    await run_in_sim(simulation.set_attack, request.type, request.sophistication)
     return {"status": "attack_set", "type": request.type, "sophistication": request.sophistication}
 
+def parse_params_body(body: bytes) -> Optional[dict]:
+    """Pull the params dict out of a raw /control/params body, or None if malformed"""
+    try:
+        params = orjson.loads(body)["params"]
+    except (orjson.JSONDecodeError, KeyError, TypeError):
+        return None
+    if not isinstance(params, dict):
+        return None
+    for value in params.values():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+    return params
+
+# Slider drags post here many times a second, so the body is decoded directly
+# instead of going through a Pydantic model; /control/params/strict keeps the
+# validated variant for schema-driven clients
 @app.post("/control/params")
-async def update_params(request: ParamsUpdate):
-    simulation.update_params(request.params)
-    return {"status": "updated", "params": simulation.params}
+async def update_params(request: Request):
+    params = parse_params_body(await request.body())
+    if params is None:
+        return OrjsonResponse({"status": "error", "message": "Invalid params"}, status_code=422)
+    try:
+        await run_in_sim(simulation.update_params, params)
+    except ValueError as exc:
+        return OrjsonResponse({"status": "error", "message": str(exc)}, status_code=422)
+    # Unknown keys are ignored, so only report the ones that took effect
+    return {"status": "updated", "changed": [k for k in params if k in PARAM_NAMES]}
+
+@app.post("/control/params/strict")
+async def update_params_strict(request: ParamsUpdate):
+    unknown = [k for k in request.params if k not in PARAM_NAMES]
+    if unknown:
+        return OrjsonResponse(
+            {"status": "error", "message": "Unknown params: " + ", ".join(unknown)}, status_code=422
+        )
+    try:
+        await run_in_sim(simulation.update_params, request.params)
+    except ValueError as exc:
+        return OrjsonResponse({"status": "error", "message": str(exc)}, status_code=422)
+    return {"status": "updated", "changed": list(request.params)}
+
+@app.get("/control/params")
+async def get_params():
+    return simulation.params
+
+@app.get("/logs/attacks")
+async def get_attack_logs(attacker_id: str, limit: int = Query(20, ge=1, le=1000)):
+    return {"attack_logs": await run_in_sim(simulation.attack_logs_for, attacker_id, limit)}
 
 @app.post("/control/vehicle")
 async def update_vehicle(request: VehicleUpdate):
-    simulation.update_vehicle(request.vehicle_id, request.updates)
+    await run_in_sim(simulation.update_vehicle, request.vehicle_id, request.updates)
     return {"status": "updated"}
 
+# Preset tables are fixed, so they are built once at import and every
+# request returns the same objects
+PRESET_I18N = {
+    "normal": {
+        "ru": {"name": "Обычный трафик", "description": "Обычное дорожное движение без атак"},
+        "en": {"name": "Normal Traffic", "description": "Regular traffic flow without attacks"},
+        "tk": {"name": "Adaty hereket", "description": "Hüjümsiz adaty ýol hereketi"},
+    },
+    "heavy": {
+        "ru": {"name": "Интенсивное движение", "description": "Плотный трафик с большим количеством V2V-связей"},
+        "en": {"name": "Heavy Traffic", "description": "Dense traffic with many V2V connections"},
+        "tk": {"name": "Dykyz hereket", "description": "Köp V2V baglanyşykly dykyz hereket"},
+    },
+    "highspeed": {
+        "ru": {"name": "Режим шоссе", "description": "Высокоскоростное движение"},
+        "en": {"name": "Highway Mode", "description": "High-speed traffic"},
+        "tk": {"name": "Ýokary tizlik", "description": "Ýokary tizlikli hereket"},
+    },
+    "attack_demo": {
+        "ru": {"name": "Демо-атака", "description": "Готовый сценарий атаки Сивиллы"},
+        "en": {"name": "Attack Demo", "description": "Ready-made Sybil attack scenario"},
+        "tk": {"name": "Hüjüm demo", "description": "Taýýar Sibil hüjümi ssenariýsi"},
+    },
+}
+
+# Scenario cards shown in the UI
+PRESET_SCENARIOS = (
+    {"id": "normal", "params": {"global_speed_multiplier": 1.0, "detection_sensitivity": 0.7}},
+    {"id": "heavy", "params": {"global_speed_multiplier": 0.5, "communication_range": 0.008}},
+    {"id": "highspeed", "params": {"global_speed_multiplier": 2.0, "detection_sensitivity": 0.5}},
+    {"id": "attack_demo", "params": {"detection_sensitivity": 0.9}, "attack": "sybil"},
+)
+
+# What loading each preset actually applies to the engine
+PRESETS = MappingProxyType({
+    "normal": {"params": {"global_speed_multiplier": 1.0}, "attack": None},
+    "heavy": {"params": {"global_speed_multiplier": 0.5, "communication_range": 0.008}, "attack": None},
+    "highspeed": {"params": {"global_speed_multiplier": 2.0}, "attack": None},
+    "attack_demo": {"params": {"detection_sensitivity": 0.9}, "attack": "sybil"}
+})
+
+PRESET_LANGUAGES = ("ru", "en", "tk")
+
+def build_presets_response(lang: str) -> dict:
+    scenarios = []
+    for scenario in PRESET_SCENARIOS:
+        text = PRESET_I18N[scenario["id"]][lang]
+        scenarios.append({
+            "id": scenario["id"],
+            "name": text["name"],
+            "description": text["description"],
+            **{k: v for k, v in scenario.items() if k != "id"},
+        })
+    return {"scenarios": scenarios}
+
+PRESETS_RESPONSES = MappingProxyType({
+    lang: CachedJSON(build_presets_response(lang)) for lang in PRESET_LANGUAGES
+})
+
 @app.get("/presets")
-async def get_presets(lang: str = "ru"):
-    presets_i18n = {
-        "normal": {
-            "ru": {"name": "Обычный трафик", "description": "Обычное дорожное движение без атак"},
-            "en": {"name": "Normal Traffic", "description": "Regular traffic flow without attacks"},
-            "tk": {"name": "Adaty hereket", "description": "Hüjümsiz adaty ýol hereketi"},
-        },
-        "heavy": {
-            "ru": {"name": "Интенсивное движение", "description": "Плотный трафик с большим количеством V2V-связей"},
-            "en": {"name": "Heavy Traffic", "description": "Dense traffic with many V2V connections"},
-            "tk": {"name": "Dykyz hereket", "description": "Köp V2V baglanyşykly dykyz hereket"},
-        },
-        "highspeed": {
-            "ru": {"name": "Режим шоссе", "description": "Высокоскоростное движение"},
-            "en": {"name": "Highway Mode", "description": "High-speed traffic"},
-            "tk": {"name": "Ýokary tizlik", "description": "Ýokary tizlikli hereket"},
-        },
-        "attack_demo": {
-            "ru": {"name": "Демо-атака", "description": "Готовый сценарий атаки Сивиллы"},
-            "en": {"name": "Attack Demo", "description": "Ready-made Sybil attack scenario"},
-            "tk": {"name": "Hüjüm demo", "description": "Taýýar Sibil hüjümi ssenariýsi"},
-        },
-    }
-    effective_lang = lang if lang in ("ru", "en", "tk") else "ru"
-    return {
-        "scenarios": [
-            {
-                "id": "normal",
-                "name": presets_i18n["normal"][effective_lang]["name"],
-                "description": presets_i18n["normal"][effective_lang]["description"],
-                "params": {"global_speed_multiplier": 1.0, "detection_sensitivity": 0.7}
-            },
-            {
-                "id": "heavy",
-                "name": presets_i18n["heavy"][effective_lang]["name"],
-                "description": presets_i18n["heavy"][effective_lang]["description"],
-                "params": {"global_speed_multiplier": 0.5, "communication_range": 0.008}
-            },
-            {
-                "id": "highspeed",
-                "name": presets_i18n["highspeed"][effective_lang]["name"],
-                "description": presets_i18n["highspeed"][effective_lang]["description"],
-                "params": {"global_speed_multiplier": 2.0, "detection_sensitivity": 0.5}
-            },
-            {
-                "id": "attack_demo",
-                "name": presets_i18n["attack_demo"][effective_lang]["name"],
-                "description": presets_i18n["attack_demo"][effective_lang]["description"],
-                "params": {"detection_sensitivity": 0.9},
-                "attack": "sybil"
-            }
-        ]
-    }
+async def get_presets(request: Request, lang: str = "ru"):
+    effective_lang = lang if lang in PRESET_LANGUAGES else "ru"
+    return PRESETS_RESPONSES[effective_lang].response(request)
+
+# Attack/defense display catalog, also sent as the first /ws frame
+CATALOG_RESPONSE = CachedJSON(simulation.get_static_metadata())
+
+@app.get("/catalog")
+async def get_catalog(request: Request):
+    return CATALOG_RESPONSE.response(request)
+
+def apply_preset(preset):
+    simulation.update_params(preset["params"])
+    simulation.set_attack(preset["attack"])
 
 @app.post("/presets/{preset_id}")
 async def load_preset(preset_id: str):
-    presets = {
-        "normal": {"params": {"global_speed_multiplier": 1.0}, "attack": None},
-        "heavy": {"params": {"global_speed_multiplier": 0.5, "communication_range": 0.008}, "attack": None},
-        "highspeed": {"params": {"global_speed_multiplier": 2.0}, "attack": None},
-        "attack_demo": {"params": {"detection_sensitivity": 0.9}, "attack": "sybil"}
-    }
-    
-    if preset_id in presets:
-        preset = presets[preset_id]
-        simulation.update_params(preset["params"])
-        simulation.set_attack(preset["attack"])
+    preset = PRESETS.get(preset_id)
+    if preset is not None:
+        await run_in_sim(apply_preset, preset)
         return {"status": "loaded", "preset": preset_id}
     
     return {"status": "error", "message": "Preset not found"}
 
+# Wire formats for the /ws telemetry stream. JSON is what the bundled
+# frontend parses; msgpack is a compact binary alternative for other clients.
+FrameFormat = Literal["json", "msgpack"]
+
+def _msgpack_default(obj):
+    # Engine log records (dataclasses) are handed over as-is; orjson encodes
+    # them natively, msgpack needs them as dicts
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+def encode_frame(data, fmt: FrameFormat = "json") -> bytes:
+    if fmt == "msgpack":
+        return msgpack.packb(data, use_bin_type=True, default=_msgpack_default)
+    return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+
+_msgpack_packer = msgpack.Packer()
+
+def join_frames(frames: list, fmt: FrameFormat = "json") -> bytes:
+    """Wrap already-encoded frames into a single array frame without re-encoding"""
+    if len(frames) == 1:
+        return frames[0]
+    if fmt == "msgpack":
+        return _msgpack_packer.pack_array_header(len(frames)) + b"".join(frames)
+    return b"[" + b",".join(frames) + b"]"
+
+# The attack/defense catalog is identical for every client, so its frame is
+# encoded once per wire format and replayed right after each handshake
+_static_frames = {}
+
+def static_frame(fmt: FrameFormat = "json") -> bytes:
+    frame = _static_frames.get(fmt)
+    if frame is None:
+        frame = _static_frames[fmt] = encode_frame(simulation.get_static_metadata(), fmt)
+    return frame
+
+TICK_INTERVAL = 0.2  # 5 FPS — sufficient for simulation
+IDLE_INTERVAL = 1.0  # state refresh while the simulation is stopped
+MAX_BATCH = 20
+MAX_TICK_LAG = 1.0  # how far behind schedule the producer may fall before resyncing
+
+def offer_latest(queue: asyncio.Queue, item):
+    """Put item on a bounded queue, dropping the stale entry a slow client never took"""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(item)
+
+def step_frames(formats: frozenset) -> dict:
+    """Advance the simulation one step and encode it once per wire format; runs on sim_executor"""
+    # step() returns live engine state, so it is encoded before the next
+    # step mutates it. Defense config only goes out with a client's first state
+    data = simulation.step()
+    data.pop("defense_config", None)
+    return {fmt: encode_frame(data, fmt) for fmt in formats}
+
+def state_frames(formats: frozenset) -> dict:
+    """Encode the current state without stepping; runs on sim_executor"""
+    data = simulation.get_current_state()
+    data.pop("defense_config", None)
+    return {fmt: encode_frame(data, fmt) for fmt in formats}
+
+def state_frame(fmt: FrameFormat) -> bytes:
+    """A client's first state, defense config included; runs on sim_executor"""
+    return encode_frame(simulation.get_current_state(), fmt)
+
+class FrameBroadcaster:
+    """Steps the shared simulation on a fixed cadence and fans each frame out
+    to every connected client.
+
+    One producer serves all sockets, so the engine advances at the same rate
+    however many clients are open, and each frame is encoded once per wire
+    format. Every client drains its own bounded queue, so a slow socket only
+    drops its own stale frames.
+    """
+
+    def __init__(self):
+        self.subscribers = {}  # queue -> wire format
+        self.task = None
+
+    def subscribe(self, fmt: FrameFormat, depth: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=depth)
+        self.subscribers[queue] = fmt
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.pop(queue, None)
+        # Nobody is watching; stop stepping until the next client connects
+        if not self.subscribers and self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def publish(self, frames: dict, stepped: bool):
+        for queue, fmt in self.subscribers.items():
+            # A client that joined mid-encode already has its first state
+            frame = frames.get(fmt)
+            if frame is not None:
+                offer_latest(queue, (frame, stepped))
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        idle_frames = None
+        try:
+            while True:
+                formats = frozenset(self.subscribers.values())
+                if simulation.is_running:
+                    frames = await run_in_sim(step_frames, formats)
+                    stepped = True
+                    delay = TICK_INTERVAL
+                    idle_frames = None
+                else:
+                    # When stopped, still send state so frontend stays in sync
+                    frames = await run_in_sim(state_frames, formats)
+                    stepped = False
+                    delay = IDLE_INTERVAL
+                    # A paused engine produces the same bytes every refresh;
+                    # only resend once something actually changed
+                    if frames == idle_frames:
+                        frames = None
+                    else:
+                        idle_frames = frames
+                if frames is not None:
+                    self.publish(frames, stepped)
+                # Sleep until an absolute deadline so step and encode time does
+                # not accumulate as drift; resync after a long stall
+                next_tick += delay
+                now = loop.time()
+                if now - next_tick > MAX_TICK_LAG:
+                    next_tick = now
+                await asyncio.sleep(max(0.0, next_tick - now))
+        except Exception:
+            # Wake the senders so their connections close if stepping fails.
+            # Cancellation (last client gone) wakes nobody: by then the
+            # subscribers may already belong to a newer producer
+            if self.task is asyncio.current_task():
+                for queue in self.subscribers:
+                    offer_latest(queue, None)
+            raise
+
+broadcaster = FrameBroadcaster()
+
+# Queued by watch_disconnect once the client has gone
+DISCONNECTED = object()
+
+async def watch_disconnect(websocket: WebSocket, queue: asyncio.Queue):
+    """Wait for the client to close and wake its sender.
+
+    The stream is one-way, so without this a paused engine (which sends
+    nothing new) would never notice a dead socket and keep it subscribed.
+    """
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass  # clients have nothing to say on /ws; drop whatever they send
+    offer_latest(queue, DISCONNECTED)
+
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(
+    websocket: WebSocket,
+    fmt: FrameFormat = "json",
+    batch: int = Query(1, ge=1, le=MAX_BATCH),
+):
     await websocket.accept()
-    sent_metadata = False
+    queue = watcher = None
     try:
+        await websocket.send_bytes(static_frame(fmt))
+        await websocket.send_bytes(await run_in_sim(state_frame, fmt))
+        # Subscribe only after the first state is out, so no older step
+        # frame can follow it
+        queue = broadcaster.subscribe(fmt, batch)
+        producer = broadcaster.task
+        watcher = asyncio.create_task(watch_disconnect(websocket, queue))
+        pending = []
         while True:
-            if simulation.is_running:
-                data = simulation.step()
-                # Send heavy metadata only once
-                if not sent_metadata:
-                    sent_metadata = True
-                else:
-                    # Strip heavy static data from per-tick messages
-                    data.pop("available_attacks", None)
-                    data.pop("available_defenses", None)
-                    data.pop("defense_config", None)
-                await websocket.send_json(data)
-                await asyncio.sleep(0.2)  # 5 FPS — sufficient for simulation
-            else:
-                # When stopped, still send state so frontend stays in sync
-                data = simulation.get_current_state()
-                if not sent_metadata:
-                    sent_metadata = True
-                else:
-                    data.pop("available_attacks", None)
-                    data.pop("available_defenses", None)
-                    data.pop("defense_config", None)
-                await websocket.send_json(data)
-                await asyncio.sleep(1.0)
+            item = await queue.get()
+            if item is DISCONNECTED:
+                print("Client disconnected")
+                break
+            if item is None:
+                if not producer.done():
+                    continue  # not our producer's failure
+                producer.result()  # re-raise whatever stopped the producer
+                break
+            frame, stepped = item
+            if stepped and batch > 1:
+                # batch > 1 collects that many steps into one array frame
+                pending.append(frame)
+                if len(pending) < batch:
+                    continue
+                frame, pending = join_frames(pending, fmt), []
+            elif pending:
+                # Paused mid-batch: flush the steps before the idle state
+                await websocket.send_bytes(join_frames(pending, fmt))
+                pending = []
+            await websocket.send_bytes(frame)
+            # send_bytes returns without suspending while the transport
+            # buffer has room; yield so other connections get a turn
+            await asyncio.sleep(0)
     except WebSocketDisconnect:
         print("Client disconnected")
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        if queue is not None:
+            broadcaster.unsubscribe(queue)
@@ -2,16 +2,71 @@ import random
 import time
 import math
 import networkx as nx
-from typing import Dict, Any, List
-from dataclasses import dataclass, asdict
-import uuid
+import numpy as np
+from typing import Deque, Dict, Any, List
+from dataclasses import dataclass, asdict, field, fields, replace
+import itertools
+from collections import defaultdict, deque
+
+# ===== CATALOG RECORDS =====
+# Static catalog entries are frozen slotted records so hot paths read
+# attributes instead of probing nested dicts
+
+@dataclass(frozen=True, slots=True)
+class VehicleSpec:
+    max_speed: float
+    acceleration: float
+    color: str
+    trust: float
+    icon: str
+
+@dataclass(frozen=True, slots=True)
+class DefenseLevel:
+    name: str
+    hack_multiplier: float
+    resist_chance: float
+    defense_bonus: float
+
+@dataclass(frozen=True, slots=True)
+class SophisticationLevel:
+    description: str
+    bypass_chance: float
+
+@dataclass(frozen=True, slots=True)
+class AttackSpec:
+    name: str
+    category: str
+    description: str
+    severity: str
+    real_world_example: str
+    target_layer: List[str]
+    educational_notes: str
+    icon: str
+    sophistication_levels: Dict[str, SophisticationLevel]
+
+    @classmethod
+    def from_dict(cls, data):
+        levels = {k: SophisticationLevel(**v) for k, v in data["sophistication_levels"].items()}
+        return cls(**{**data, "sophistication_levels": levels})
+
+@dataclass(frozen=True, slots=True)
+class DefenseSpec:
+    name: str
+    type: str
+    description: str
+    effectiveness: Dict[str, int]
+    detection_time: float
+    false_positive_rate: float
+    educational_notes: str
+    icon: str
+    applicable_to: List[str]
 
 # Vehicle type definitions
 VEHICLE_TYPES = {
-    "passenger": {"max_speed": 60, "acceleration": 3, "color": "blue", "trust": 0.9, "icon": "car"},
-    "truck": {"max_speed": 40, "acceleration": 2, "color": "green", "trust": 0.85, "icon": "truck"},
-    "emergency": {"max_speed": 80, "acceleration": 5, "color": "red", "trust": 0.95, "icon": "emergency"},
-    "bus": {"max_speed": 35, "acceleration": 1.5, "color": "orange", "trust": 0.88, "icon": "bus"},
+    "passenger": VehicleSpec(max_speed=60, acceleration=3, color="blue", trust=0.9, icon="car"),
+    "truck": VehicleSpec(max_speed=40, acceleration=2, color="green", trust=0.85, icon="truck"),
+    "emergency": VehicleSpec(max_speed=80, acceleration=5, color="red", trust=0.95, icon="emergency"),
+    "bus": VehicleSpec(max_speed=35, acceleration=1.5, color="orange", trust=0.88, icon="bus"),
 }
 
 # Human-readable vehicle names by type
@@ -34,11 +89,32 @@ VEHICLE_NAMES = {
 
 # Defense level multipliers: higher multiplier = slower hacking = better defense
 DEFENSE_LEVELS = {
-    "low":    {"name": "Низкий",  "hack_multiplier": 0.5, "resist_chance": 0.0,  "defense_bonus": 0.7},
-    "medium": {"name": "Средний", "hack_multiplier": 1.0, "resist_chance": 0.15, "defense_bonus": 1.0},
-    "high":   {"name": "Высокий", "hack_multiplier": 3.0, "resist_chance": 0.4,  "defense_bonus": 1.5},
+    "low":    DefenseLevel(name="Низкий",  hack_multiplier=0.5, resist_chance=0.0,  defense_bonus=0.7),
+    "medium": DefenseLevel(name="Средний", hack_multiplier=1.0, resist_chance=0.15, defense_bonus=1.0),
+    "high":   DefenseLevel(name="Высокий", hack_multiplier=3.0, resist_chance=0.4,  defense_bonus=1.5),
 }
 
+# Traffic light state codes (index into LIGHT_STATES) and phase length in steps
+LIGHT_STATES = ("green", "red")
+LIGHT_RED = LIGHT_STATES.index("red")
+LIGHT_PHASE_STEPS = 100
+
+# V2V links only feed a counter in the UI, so they are recomputed every
+# V2V_STRIDE steps; in between the last set is kept and receipts are
+# credited V2V_STRIDE at a time to keep the totals on track
+V2V_STRIDE = 3
+# Only the closest links are itemised in a frame; v2v_count has the total
+V2V_REPORT_LIMIT = 50
+
+# Routing and timer bookkeeping the frontend never reads; kept off the wire
+VEHICLE_INTERNAL_FIELDS = frozenset({
+    "current_node", "target_node", "path_idx", "progress", "hack_cooldown", "hack_recovery_timer",
+})
+# Decimals kept on the wire: 1e-6 degrees is ~0.1 m, well under a map pixel,
+# and headings only rotate an icon. Engine state keeps full precision
+WIRE_COORD_DECIMALS = 6
+WIRE_HEADING_DECIMALS = 1
+
 # Attack sophistication multipliers for hack speed
 ATTACK_SPEED_MULTIPLIERS = {
     "low":    0.6,
@@ -47,7 +123,7 @@ ATTACK_SPEED_MULTIPLIERS = {
 }
 
 # ===== REALISTIC V2X ATTACK TYPES =====
-ATTACK_TYPES = {
+_ATTACK_CATALOG = {
     "position_falsification": {
         "name": "Фальсификация позиции",
         "category": "message_manipulation",
@@ -200,8 +276,17 @@ ATTACK_TYPES = {
     }
 }
 
+ATTACK_TYPES = {k: AttackSpec.from_dict(v) for k, v in _ATTACK_CATALOG.items()}
+
+# (attack type, sophistication) -> bypass chance, flattened for attack resolution
+BYPASS_CHANCE = {
+    (k, level): info.bypass_chance
+    for k, spec in ATTACK_TYPES.items()
+    for level, info in spec.sophistication_levels.items()
+}
+
 # ===== DEFENSE MECHANISMS =====
-DEFENSE_TYPES = {
+_DEFENSE_CATALOG = {
     "cryptographic_verification": {
         "name": "Криптографическая проверка подписи",
         "type": "cryptographic",
@@ -281,8 +366,39 @@ DEFENSE_TYPES = {
     }
 }
 
+DEFENSE_TYPES = {k: DefenseSpec(**v) for k, v in _DEFENSE_CATALOG.items()}
+
+# (attack type, sophistication) -> ((defense key, base effectiveness %, defense
+# info), ...) for the defenses that apply to it, in DEFENSE_TYPES order
+APPLICABLE_DEFENSES = {
+    (attack_type, level): tuple(
+        (key, info.effectiveness.get(level, 50), info)
+        for key, info in DEFENSE_TYPES.items()
+        if attack_type in info.applicable_to
+    )
+    for attack_type, spec in ATTACK_TYPES.items()
+    for level in spec.sophistication_levels
+}
+
+# Display-only subsets of the catalogs for the frontend. The engine's hot
+# numbers live in BYPASS_CHANCE and APPLICABLE_DEFENSES; these are built
+# once and only ever sent to clients
+ATTACK_PRESENTATION = {k: {
+    "name": v.name,
+    "icon": v.icon,
+    "severity": v.severity,
+    "description": v.description
+} for k, v in ATTACK_TYPES.items()}
+
+DEFENSE_PRESENTATION = {k: {
+    "name": v.name,
+    "icon": v.icon,
+    "type": v.type,
+    "description": v.description
+} for k, v in DEFENSE_TYPES.items()}
+
 # ===== DATA STRUCTURES FOR LOGGING =====
-@dataclass
+@dataclass(slots=True)
 class AttackLog:
     """Represents a single attack event for educational logging"""
     id: str
@@ -297,11 +413,32 @@ class AttackLog:
     icon: str
     attack_data: Dict[str, Any]  # Attack-specific data
     educational_context: str
+    # Serialized form, built once; orjson skips underscore fields
+    _dict: Dict[str, Any] = field(default=None, init=False, repr=False, compare=False)
     
     def to_dict(self):
-        return asdict(self)
+        # Spelled out rather than asdict(), which deep-copies every field.
+        # Only status changes after creation, so a cached dict just refreshes it
+        if self._dict is None:
+            self._dict = {
+                "id": self.id,
+                "timestamp": self.timestamp,
+                "attack_type": self.attack_type,
+                "attacker_id": self.attacker_id,
+                "target_ids": self.target_ids,
+                "sophistication": self.sophistication,
+                "status": self.status,
+                "description": self.description,
+                "severity": self.severity,
+                "icon": self.icon,
+                "attack_data": self.attack_data,
+                "educational_context": self.educational_context,
+            }
+        else:
+            self._dict["status"] = self.status
+        return self._dict
 
-@dataclass
+@dataclass(slots=True)
 class DefenseLog:
     """Represents a defense mechanism activation"""
     id: str
@@ -315,11 +452,27 @@ class DefenseLog:
     confidence: float  # 0-1
     explanation: str
     icon: str
+    _dict: Dict[str, Any] = field(default=None, init=False, repr=False, compare=False)
     
     def to_dict(self):
-        return asdict(self)
+        # Defense logs are write-once, so the dict is built on first use
+        if self._dict is None:
+            self._dict = {
+                "id": self.id,
+                "timestamp": self.timestamp,
+                "defense_type": self.defense_type,
+                "attack_id": self.attack_id,
+                "attacker_id": self.attacker_id,
+                "action_taken": self.action_taken,
+                "success": self.success,
+                "detection_time": self.detection_time,
+                "confidence": self.confidence,
+                "explanation": self.explanation,
+                "icon": self.icon,
+            }
+        return self._dict
 
-@dataclass
+@dataclass(slots=True)
 class AttackOutcome:
     """Represents the final outcome of an attack vs defense interaction"""
     id: str
@@ -331,24 +484,195 @@ class AttackOutcome:
     learning_points: str
     attack_succeeded: bool
     defenses_triggered: int
+    _dict: Dict[str, Any] = field(default=None, init=False, repr=False, compare=False)
     
+    def to_dict(self):
+        # Outcomes are write-once, so the dict is built on first use
+        if self._dict is None:
+            self._dict = {
+                "id": self.id,
+                "timestamp": self.timestamp,
+                "attack_id": self.attack_id,
+                "defense_ids": self.defense_ids,
+                "result": self.result,
+                "impact_description": self.impact_description,
+                "learning_points": self.learning_points,
+                "attack_succeeded": self.attack_succeeded,
+                "defenses_triggered": self.defenses_triggered,
+            }
+        return self._dict
+
+# ===== SIMULATION PARAMETERS =====
+@dataclass(frozen=True, slots=True)
+class SimulationParams:
+    """Tunable simulation parameters, replaced as a whole on every update"""
+    global_speed_multiplier: float = 0.5
+    message_frequency: float = 1.0
+    detection_sensitivity: float = 0.7
+    communication_range: float = 0.005
+
+    def updated(self, changes):
+        """Return a copy with the known keys of changes applied.
+
+        Raises ValueError if the result has no usable BSM rate or range.
+        """
+        params = replace(self, **{k: v for k, v in changes.items() if k in PARAM_NAMES})
+        if not params.message_frequency > 0:
+            raise ValueError("message_frequency must be positive")
+        if not params.communication_range > 0:
+            raise ValueError("communication_range must be positive")
+        return params
+
     def to_dict(self):
         return asdict(self)
 
+# Keys an update may set; anything else in a request is ignored
+PARAM_NAMES = frozenset(f.name for f in fields(SimulationParams))
+
+def _advance_along_edges(start, delta, edge_dist, progress, speed_kmh, speed_multiplier):
+    """Movement kernel for a batch of vehicles on straight road edges.
+
+    start and delta are (n, 2) lat/lon arrays of each vehicle's edge origin
+    and edge vector, edge_dist the edge lengths. Returns the new edge progress
+    and the interpolated positions; vehicles whose progress reached 1.0 still
+    need arrival handling.
+    """
+    speed_deg_per_sec = (speed_kmh / 111) / 3600
+    move_dist = speed_deg_per_sec * 0.1 * speed_multiplier
+    with np.errstate(divide="ignore", invalid="ignore"):
+        progress = np.where(edge_dist > 0, progress + move_dist / edge_dist, 1.0)
+    pos = start + delta * progress[:, None]
+    return progress, pos
+
+# How many attack/defense/outcome logs a session keeps
+LOG_RETENTION = 10_000
+LOG_RETENTION_PER_ATTACKER = 1_000
+
+def _recent(logs, n):
+    """Last n entries of a list or deque, oldest first.
+
+    Walks in from the right end, so the cost follows n rather than the
+    retention size of the buffer.
+    """
+    tail = list(itertools.islice(reversed(logs), max(n, 0)))
+    tail.reverse()
+    return tail
+
+class SpatialGrid:
+    """Uniform grid over vehicle positions for fixed-radius neighbour searches.
+
+    Cells are cell_size wide, so a search of radius r only measures vehicles
+    in the ceil(r / cell_size) rings of cells around the query; with the cell
+    size set to the communication range, pairs() only checks adjacent cells.
+
+    Fleets of up to DENSE_LIMIT vehicles skip the cells altogether: measuring
+    every pair with one broadcast is cheaper than bucketing them.
+    """
+
+    # Half of the 3x3 cell neighbourhood: every adjacent cell pair is visited once
+    HALF_NEIGHBOURHOOD = ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1))
+    DENSE_LIMIT = 512
+
+    def __init__(self, lat, lon, cell_size):
+        self.lat = lat
+        self.lon = lon
+        self.cell_size = cell_size
+        self.cells = {}
+        self.dense = len(lat) <= self.DENSE_LIMIT
+        if cell_size <= 0 or self.dense:
+            return
+        cell_x = np.floor(lat / cell_size).astype(np.int64)
+        cell_y = np.floor(lon / cell_size).astype(np.int64)
+        # Bucket with one stable sort so each cell's members stay in index order
+        order = np.lexsort((cell_y, cell_x))
+        sx, sy = cell_x[order], cell_y[order]
+        starts = np.flatnonzero(np.r_[True, (sx[1:] != sx[:-1]) | (sy[1:] != sy[:-1])])
+        self.cells = dict(zip(
+            zip(sx[starts].tolist(), sy[starts].tolist()),
+            np.split(order.astype(np.intp), starts[1:]),
+        ))
+
+    def _cell_of(self, idx):
+        return (math.floor(self.lat[idx] / self.cell_size), math.floor(self.lon[idx] / self.cell_size))
+
+    def pairs(self):
+        """All index pairs (i < j) closer than cell_size, with their distances.
+
+        Pairs come back in the same order as a nested i/j loop would produce them.
+        """
+        empty = np.empty(0, dtype=np.intp)
+        if self.cell_size <= 0:
+            return empty, empty, np.empty(0)
+        if self.dense:
+            d_lat = self.lat[:, None] - self.lat[None, :]
+            d_lon = self.lon[:, None] - self.lon[None, :]
+            in_range = d_lat * d_lat + d_lon * d_lon < self.cell_size * self.cell_size
+            ii, jj = np.nonzero(np.triu(in_range, k=1))
+            return ii, jj, np.hypot(d_lat[ii, jj], d_lon[ii, jj])
+        cand_a, cand_b = [], []
+        for (x, y), members in self.cells.items():
+            for dx, dy in self.HALF_NEIGHBOURHOOD:
+                if dx == 0 and dy == 0:
+                    a, b = np.triu_indices(len(members), k=1)
+                    cand_a.append(members[a])
+                    cand_b.append(members[b])
+                    continue
+                other = self.cells.get((x + dx, y + dy))
+                if other is not None:
+                    cand_a.append(np.repeat(members, len(other)))
+                    cand_b.append(np.tile(other, len(members)))
+        if not cand_a:
+            return empty, empty, np.empty(0)
+
+        a = np.concatenate(cand_a)
+        b = np.concatenate(cand_b)
+        ii = np.minimum(a, b)
+        jj = np.maximum(a, b)
+        d_lat = self.lat[ii] - self.lat[jj]
+        d_lon = self.lon[ii] - self.lon[jj]
+        # Compare squared distances; only pairs in range pay for the sqrt
+        mask = d_lat * d_lat + d_lon * d_lon < self.cell_size * self.cell_size
+        ii, jj = ii[mask], jj[mask]
+        dist = np.hypot(d_lat[mask], d_lon[mask])
+        order = np.lexsort((jj, ii))
+        return ii[order], jj[order], dist[order]
+
+    def query(self, idx, radius):
+        """Sorted indices of vehicles closer than radius to vehicle idx (itself included)"""
+        if self.dense and self.cell_size > 0 and radius > 0:
+            d_lat = self.lat - self.lat[idx]
+            d_lon = self.lon - self.lon[idx]
+            return np.flatnonzero(d_lat * d_lat + d_lon * d_lon < radius * radius)
+        if not self.cells or radius <= 0:
+            return np.empty(0, dtype=np.intp)
+        x, y = self._cell_of(idx)
+        rings = math.ceil(radius / self.cell_size)
+        found = [self.cells[cell] for cell in (
+            (x + dx, y + dy) for dx in range(-rings, rings + 1) for dy in range(-rings, rings + 1)
+        ) if cell in self.cells]
+        cand = np.sort(np.concatenate(found))
+        d_lat = self.lat[cand] - self.lat[idx]
+        d_lon = self.lon[cand] - self.lon[idx]
+        return cand[d_lat * d_lat + d_lon * d_lon < radius * radius]
+
 class SimulationEngine:
     def __init__(self):
         self.is_running = False
         self.step_count = 0
         self.active_attack = None
         self.v2v_messages = []
+        self.v2v_count = 0
         self.anomaly_detections = []
         
         # NEW: Attack/Defense Logging System
-        self.attack_logs: List[AttackLog] = []
-        self.defense_logs: List[DefenseLog] = []
-        self.outcome_logs: List[AttackOutcome] = []
+        self._init_logs()
         self.active_attacks: Dict[str, Dict[str, Any]] = {}  # attack_id -> attack_state
         self.attack_sophistication = "medium"  # Default attack difficulty
+        # Log ids only need to be unique within the process, so a counter
+        # shared by all log kinds (and kept across resets) is enough
+        self._log_seq = itertools.count(1)
+        # Block draws for defense rolls; seeded from `random` like the fleet
+        self._rng = np.random.default_rng(random.getrandbits(64))
         
         # NEW: Defense System Configuration
         self.defense_config = {
@@ -371,16 +695,13 @@ class SimulationEngine:
         
         # Initialize Road Network & Traffic Lights
         self.road_graph = self._create_advanced_road_network()
-        self.traffic_lights = self._init_traffic_lights()
+        self._index_road_graph()
+        self._init_traffic_lights()
         self.vehicles = self._generate_initial_vehicles(count=10)
+        self._index_vehicles()
         
         # Simulation parameters
-        self.params = {
-            "global_speed_multiplier": 0.5,
-            "message_frequency": 1.0,
-            "detection_sensitivity": 0.7,
-            "communication_range": 0.005
-        }
+        self._apply_params(SimulationParams())
 
     def _create_advanced_road_network(self):
         """Create a road network aligned with real Lower Manhattan streets.
@@ -458,11 +779,6 @@ class SimulationEngine:
             ],
         }
 
-        for _street, nodes in ns_streets.items():
-            for i in range(len(nodes) - 1):
-                G.add_edge(nodes[i], nodes[i + 1])
-                G.add_edge(nodes[i + 1], nodes[i])
-
         # ── Edges (bidirectional): E-W cross-streets ─────────────────────
         ew_streets = {
             "rector":    ["greenwich_rector",    "wbway_rector",    "church_rector",    "bway_rector"],
@@ -473,61 +789,92 @@ class SimulationEngine:
             "murray":    ["greenwich_murray",    "wbway_murray",    "church_murray",    "bway_murray"],
         }
 
-        for _street, nodes in ew_streets.items():
-            for i in range(len(nodes) - 1):
-                G.add_edge(nodes[i], nodes[i + 1])
-                G.add_edge(nodes[i + 1], nodes[i])
+        # Both directions of every street segment in one batch; the pair order
+        # (a->b, then b->a) keeps successor order, and so routing, stable
+        G.add_edges_from(
+            edge
+            for nodes in (*ns_streets.values(), *ew_streets.values())
+            for a, b in zip(nodes, nodes[1:])
+            for edge in ((a, b), (b, a))
+        )
 
         return G
 
     def _init_traffic_lights(self):
-        """Initialize traffic lights at intersections"""
-        lights = {}
-        for node in self.road_graph.nodes():
-            # Only put lights at nodes with >= 3 neighbors (intersections)
-            if len(list(self.road_graph.neighbors(node))) >= 3:
-                lights[node] = {
-                    "state": random.choice(["red", "green"]),
-                    "timer": random.randint(0, 100)
-                }
-        return lights
+        """Initialize traffic lights at intersections.
+
+        Light state lives in parallel arrays indexed through _light_index;
+        state codes index into LIGHT_STATES. _red_at_node mirrors the red
+        lights onto node slots for the movement pass.
+        """
+        # Only put lights at nodes with >= 3 neighbors (intersections)
+        nodes = [node for node, degree in self.road_graph.out_degree() if degree >= 3]
+        # Initial phases and timers in one draw each, seeded from `random`
+        # like the fleet
+        rng = np.random.default_rng(random.getrandbits(64))
+        self._light_nodes = nodes
+        self._light_index = {node: i for i, node in enumerate(nodes)}
+        self._light_state = rng.integers(len(LIGHT_STATES), size=len(nodes)).astype(np.int8)
+        self._light_timer = rng.integers(0, 100, size=len(nodes), endpoint=True).astype(np.int16)
+        self._light_slots = np.array([self._node_slot[node] for node in nodes], dtype=np.intp)
+        self._red_at_node = np.zeros(len(self._node_xy), dtype=bool)
+        self._sync_red_lights()
+
+    def _update_traffic_lights(self):
+        """Advance every light timer and flip the ones whose phase ran out"""
+        self._light_timer += 1
+        flip = self._light_timer > LIGHT_PHASE_STEPS
+        # Mask arithmetic rather than fancy indexing: no index arrays are built
+        self._light_state ^= flip
+        self._light_timer *= ~flip
+        if flip.any():
+            self._sync_red_lights()
+
+    def _sync_red_lights(self):
+        self._red_at_node[self._light_slots] = self._light_state == LIGHT_RED
+
+    def _lights_payload(self):
+        return {
+            node: {"state": LIGHT_STATES[state], "timer": timer}
+            for node, state, timer in zip(self._light_nodes, self._light_state.tolist(), self._light_timer.tolist())
+        }
 
     def _generate_initial_vehicles(self, count=30):
         vehicles = []
         types = list(VEHICLE_TYPES.keys())
-        nodes = list(self.road_graph.nodes())
+        nodes = self._node_list
+        destinations = self._destinations
+
+        # Draw every random choice up front; seeding from `random` keeps
+        # random.seed() reproducible for the whole engine
+        rng = np.random.default_rng(random.getrandbits(64))
+        vtypes = np.asarray(types)[rng.integers(len(types), size=count)]
+        vtypes = np.where(rng.random(count) < 0.4, "truck", vtypes).tolist()
+        start_nodes = rng.integers(len(nodes), size=count).tolist()
+        end_rolls = rng.random(count).tolist()
+        # Defense level: weighted random (more medium, fewer high)
+        defense_levels = np.asarray(["low", "medium", "high"])[
+            np.searchsorted([0.3, 0.75], rng.random(count), side="right")
+        ].tolist()
+        name_rolls = rng.random(count).tolist()
         
         for i in range(count):
-            vtype = random.choice(types)
-            if random.random() < 0.4: vtype = "truck"
-                
+            vtype = vtypes[i]
             config = VEHICLE_TYPES[vtype]
-            start_node = random.choice(nodes)
-            
-            end_node = start_node
-            path = []
-            attempts = 0
-            while (end_node == start_node or not path) and attempts < 10:
-                end_node = random.choice(nodes)
-                path = self._get_path(start_node, end_node)
-                attempts += 1
+            start_node = nodes[start_nodes[i]]
             
-            if not path: continue
+            # Destination drawn straight from the nodes this start can reach
+            reachable = destinations[start_node]
+            if not reachable: continue
+            end_node = reachable[int(end_rolls[i] * len(reachable))]
+            path = self._get_path(start_node, end_node)
             
-            pos = self.road_graph.nodes[start_node]["pos"]
-            
-            # Assign defense level: weighted random (more medium, fewer high)
-            defense_roll = random.random()
-            if defense_roll < 0.3:
-                defense_level = "low"
-            elif defense_roll < 0.75:
-                defense_level = "medium"
-            else:
-                defense_level = "high"
+            pos = self._node_pos[start_node]
+            defense_level = defense_levels[i]
 
             # Pick a human-readable name for this vehicle type
             name_pool = VEHICLE_NAMES.get(vtype, VEHICLE_NAMES["passenger"])
-            vname = random.choice(name_pool)
+            vname = name_pool[int(name_rolls[i] * len(name_pool))]
 
             vehicles.append({
                 "id": f"v_{i}",
@@ -537,10 +884,10 @@ class SimulationEngine:
                 "lon": pos[1],
                 "speed": 0,
                 "heading": 0,
-                "trust_score": config["trust"],
+                "trust_score": config.trust,
                 "is_attacker": False,
-                "max_speed": config["max_speed"],
-                "color": config["color"],
+                "max_speed": config.max_speed,
+                "color": config.color,
                 "defense_level": defense_level,
                 "messages_sent": 0,
                 "messages_received": 0,
@@ -549,6 +896,7 @@ class SimulationEngine:
                 "target_node": path[1] if len(path) > 1 else start_node,
                 "destination": end_node,
                 "path": path,
+                "path_idx": 0,  # Position of current_node in path
                 "status": "moving",
                 "progress": 0.0,
                 "hack_progress": 0.0,
@@ -569,11 +917,68 @@ class SimulationEngine:
             
         return vehicles
 
+    def _init_logs(self):
+        """Bounded log buffers, plus attack logs indexed by attacker"""
+        self.attack_logs: Deque[AttackLog] = deque(maxlen=LOG_RETENTION)
+        self.defense_logs: Deque[DefenseLog] = deque(maxlen=LOG_RETENTION)
+        self.outcome_logs: Deque[AttackOutcome] = deque(maxlen=LOG_RETENTION)
+        self._attack_logs_by_attacker: Dict[str, Deque[AttackLog]] = defaultdict(
+            lambda: deque(maxlen=LOG_RETENTION_PER_ATTACKER)
+        )
+
+    def attack_logs_for(self, attacker_id, limit=20):
+        """Most recent attack logs started by one attacker"""
+        logs = self._attack_logs_by_attacker.get(attacker_id, ())
+        return [log.to_dict() for log in _recent(logs, limit)]
+
+    def _index_road_graph(self):
+        """Snapshot node positions and precompute every route on the (small, static) road graph"""
+        self._node_pos = {n: data["pos"] for n, data in self.road_graph.nodes(data=True)}
+        self._node_list = list(self._node_pos)
+        self._edge_list = list(self.road_graph.edges)
+        # Row of each node in _node_xy, for gathering edge endpoints by index
+        self._node_slot = {n: i for i, n in enumerate(self._node_pos)}
+        self._node_xy = np.array(list(self._node_pos.values()), dtype=np.float64).reshape(-1, 2)
+        # Vector, length and heading of the straight segment between every pair
+        # of node slots; the graph is small, so dense tables beat per-step math
+        self._edge_delta = self._node_xy[None, :, :] - self._node_xy[:, None, :]
+        self._edge_length = np.sqrt(self._edge_delta[..., 0] ** 2 + self._edge_delta[..., 1] ** 2)
+        self._edge_heading = np.degrees(np.arctan2(self._edge_delta[..., 1], self._edge_delta[..., 0])) % 360
+        adjacency = {n: list(self.road_graph.successors(n)) for n in self.road_graph}
+        self._routes = {n: self._routes_from(adjacency, n) for n in adjacency}
+        # Other nodes reachable from each node, for drawing spawn destinations
+        self._destinations = {
+            start: [end for end in routes if end != start] for start, routes in self._routes.items()
+        }
+        # First edge of every route; a vehicle already at its goal stays put
+        self._next_hop = {
+            (start, end): route[1] if len(route) > 1 else start
+            for start, routes in self._routes.items() for end, route in routes.items()
+        }
+
+    @staticmethod
+    def _routes_from(adjacency, source):
+        """Breadth-first search from source; maps each reachable node to its route.
+
+        Routes are tuples, so the table entries can be handed out and shared
+        between vehicles without copying.
+        """
+        parent = {source: None}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            for nxt in adjacency[node]:
+                if nxt not in parent:
+                    parent[nxt] = node
+                    queue.append(nxt)
+        # parent is in BFS order, so every node's parent route is already built
+        routes = {source: (source,)}
+        for node, prev in itertools.islice(parent.items(), 1, None):
+            routes[node] = routes[prev] + (node,)
+        return routes
+
     def _get_path(self, start, end):
-        try:
-            return nx.shortest_path(self.road_graph, start, end)
-        except (nx.NetworkXNoPath, nx.NodeNotFound, nx.NetworkXError):
-            return []
+        return self._routes.get(start, {}).get(end, ())
 
     def start(self):
         self.is_running = True
@@ -586,15 +991,16 @@ class SimulationEngine:
         self.step_count = 0
         self.active_attack = None
         self.v2v_messages = []
+        self.v2v_count = 0
         self.anomaly_detections = []
         # Reset attack/defense logs
-        self.attack_logs = []
-        self.defense_logs = []
-        self.outcome_logs = []
+        self._init_logs()
         self.active_attacks = {}
-        self.road_graph = self._create_advanced_road_network()
-        self.traffic_lights = self._init_traffic_lights()
+        # The road graph and its route tables are static; only lights and
+        # vehicles start over
+        self._init_traffic_lights()
         self.vehicles = self._generate_initial_vehicles(count=10)
+        self._index_vehicles()
 
 
     def set_attack(self, attack_type, sophistication="medium"):
@@ -615,11 +1021,11 @@ class SimulationEngine:
                 del self.active_attacks[attack_id]
         else:
           # Trigger attack from each attacker vehicle
-            attackers = [v for v in self.vehicles if v.get("is_attacker", False)]
-            for attacker in attackers[:1]:  # Start with just one attacker for clarity
+            attacker = self._lead_attacker()
+            if attacker is not None:
                 attack_id = self.initiate_attack(attack_type, attacker["id"], sophistication)
                 if attack_id:
-                    print(f"[ATTACK] {ATTACK_TYPES[attack_type]['name']} initiated by {attacker['id']} (ID: {attack_id})")
+                    print(f"[ATTACK] {ATTACK_TYPES[attack_type].name} initiated by {attacker['id']} (ID: {attack_id})")
                     # Schedule attack resolution after some time
                     attack_state = self.active_attacks[attack_id]
                     attack_state["resolution_step"] = self.step_count + random.randint(30, 60)  # 3-6 seconds
@@ -627,13 +1033,83 @@ class SimulationEngine:
 
 
     def update_params(self, params):
-        self.params.update(params)
+        self._apply_params(self.params.updated(params))
+
+    def _apply_params(self, params):
+        """Install a new parameter set and everything derived from it.
+
+        Everything is derived before anything is assigned, so a failure
+        leaves the previous parameters fully in place.
+        """
+        # Steps between BSM rounds; at least one so high frequencies emit every step
+        bsm_interval = max(1, int(10 / params.message_frequency))
+        # An attacker keeps hacking a target up to 1.2x the communication range
+        hack_range_sq = (params.communication_range * 1.2) ** 2
+        # Anomaly thresholds scale with sensitivity (higher sensitivity = lower threshold)
+        sensitivity = params.detection_sensitivity
+        speed_threshold = 200 - (sensitivity * 80)  # Range: 144-200 km/h
+        time_threshold = 10 - (sensitivity * 6)  # Range: 4-10 seconds
+        payload = params.to_dict()
+
+        self.params = params
+        self._params_payload = payload
+        self._bsm_interval = bsm_interval
+        self._hack_range_sq = hack_range_sq
+        self._speed_threshold = speed_threshold
+        self._time_threshold = time_threshold
 
     def update_vehicle(self, vehicle_id, updates):
-        for v in self.vehicles:
-            if v["id"] == vehicle_id:
-                v.update(updates)
-                break
+        v = self._vehicle(vehicle_id)
+        if v is not None:
+            v.update(updates)
+            self._index_vehicles()
+
+    def _index_vehicles(self):
+        """Rebuild the id index and the array mirror of self.vehicles.
+
+        The vehicle dicts stay the wire format; vectorised kernels read the
+        parallel arrays, and _move_vehicles keeps the movement fields of both
+        in step. Edge endpoints are held as node slots into _node_xy.
+        """
+        count = len(self.vehicles)
+        slot = self._node_slot
+        self._vehicle_index = {v["id"]: i for i, v in enumerate(self.vehicles)}
+        self._lat = np.fromiter((v["lat"] for v in self.vehicles), dtype=np.float64, count=count)
+        self._lon = np.fromiter((v["lon"] for v in self.vehicles), dtype=np.float64, count=count)
+        self._is_attacker = np.fromiter((v["is_attacker"] for v in self.vehicles), dtype=bool, count=count)
+        # status == "moving", kept in step wherever step() changes a status
+        self._moving = np.fromiter((v["status"] == "moving" for v in self.vehicles), dtype=bool, count=count)
+        # Resolved once here; defense_level only changes through update_vehicle
+        self._defense_specs = [
+            DEFENSE_LEVELS.get(v.get("defense_level", "medium"), DEFENSE_LEVELS["medium"]) for v in self.vehicles
+        ]
+        self._progress = np.fromiter((v["progress"] for v in self.vehicles), dtype=np.float64, count=count)
+        self._cruise_kmh = np.fromiter((v["max_speed"] for v in self.vehicles), dtype=np.float64, count=count) * 0.6
+        self._current_slot = np.fromiter((slot[v["current_node"]] for v in self.vehicles), dtype=np.intp, count=count)
+        self._target_slot = np.fromiter((slot[v["target_node"]] for v in self.vehicles), dtype=np.intp, count=count)
+        self._grid = None
+
+    def _spatial_grid(self):
+        """Grid over current positions, rebuilt only after vehicles have moved"""
+        cell_size = self.params.communication_range
+        if self._grid is None or self._grid.cell_size != cell_size:
+            self._grid = SpatialGrid(self._lat, self._lon, cell_size)
+        return self._grid
+
+    def _vehicle(self, vehicle_id):
+        idx = self._vehicle_index.get(vehicle_id)
+        return None if idx is None else self.vehicles[idx]
+
+    def _vehicles_by_ids(self, vehicle_ids):
+        """Known vehicles among vehicle_ids, in fleet order"""
+        index = self._vehicle_index
+        return [self.vehicles[i] for i in sorted(index[vid] for vid in set(vehicle_ids) if vid in index)]
+
+    def _lead_attacker(self):
+        """First attacker in fleet order (attacks start from one attacker for clarity), or None"""
+        if not self._is_attacker.any():
+            return None
+        return self.vehicles[int(self._is_attacker.argmax())]
 
     # ===== NEW: ATTACK/DEFENSE METHODS =====
     
@@ -645,19 +1121,18 @@ class SimulationEngine:
             return None
             
         attack_info = ATTACK_TYPES[attack_type]
-        attack_id = f"atk_{uuid.uuid4().hex[:8]}"
+        attack_id = f"atk_{next(self._log_seq):08x}"
         
         # Find targets (nearby vehicles for most attacks)
-        attacker = next((v for v in self.vehicles if v["id"] == attacker_id), None)
-        if not attacker:
+        attacker_idx = self._vehicle_index.get(attacker_id)
+        if attacker_idx is None:
             return None
             
-        targets = []
-        for v in self.vehicles:
-            if v["id"] != attacker_id and not v.get("is_attacker", False):
-                dist = self._distance(attacker, v)
-                if dist < self.params["communication_range"] * 2:
-                    targets.append(v["id"])
+        # Attackers (the attacker included) are masked out in bulk; only the
+        # kept targets are turned back into ids
+        in_range = self._spatial_grid().query(attacker_idx, self.params.communication_range * 2)
+        in_range = in_range[~self._is_attacker[in_range]][:3]  # Limit to 3 targets for clarity
+        targets = [self.vehicles[i]["id"] for i in in_range.tolist()]
         
         # Create attack log
         attack_log = AttackLog(
@@ -665,20 +1140,21 @@ class SimulationEngine:
             timestamp=time.time(),
             attack_type=attack_type,
             attacker_id=attacker_id,
-            target_ids=targets[:3],  # Limit to 3 targets for clarity
+            target_ids=targets,
             sophistication=sophistication,
             status="initiated",
-            description=attack_info["description"],
-            severity=attack_info["severity"],
-            icon=attack_info["icon"],
+            description=attack_info.description,
+            severity=attack_info.severity,
+            icon=attack_info.icon,
             attack_data={
-                "bypass_chance": attack_info["sophistication_levels"][sophistication]["bypass_chance"],
-                "sophistication_desc": attack_info["sophistication_levels"][sophistication]["description"]
+                "bypass_chance": BYPASS_CHANCE[attack_type, sophistication],
+                "sophistication_desc": attack_info.sophistication_levels[sophistication].description
             },
-            educational_context=attack_info["educational_notes"]
+            educational_context=attack_info.educational_notes
         )
         
         self.attack_logs.append(attack_log)
+        self._attack_logs_by_attacker[attacker_id].append(attack_log)
         self.active_attacks[attack_id] = {
             "attack_log": attack_log,
             "start_time": time.time(),
@@ -696,11 +1172,11 @@ class SimulationEngine:
         attack_type = attack_log.attack_type
         attack_info = ATTACK_TYPES[attack_type]
         sophistication = attack_log.sophistication
-        bypass_chance = attack_info["sophistication_levels"][sophistication]["bypass_chance"]
+        bypass_chance = BYPASS_CHANCE[attack_type, sophistication]
         
         # Find target vehicles to include in logs
         target_ids = attack_log.target_ids
-        target_vehicles = [v for v in self.vehicles if v["id"] in target_ids]
+        target_vehicles = self._vehicles_by_ids(target_ids)
         
         # Determine average target defense level for log context
         avg_defense = "medium"
@@ -714,49 +1190,55 @@ class SimulationEngine:
         defense_logs_created = []
         defenses_succeeded = []
         
-        # Find applicable defenses
-        for defense_key, defense_info in DEFENSE_TYPES.items():
-            if attack_type not in defense_info["applicable_to"]:
-                continue
-                
-            if not self.defense_config[defense_key]["enabled"]:
+        # Boost effectiveness based on target vehicle defense level
+        target_defense = DEFENSE_LEVELS.get(avg_defense, DEFENSE_LEVELS["medium"])
+        defense_level_bonus = target_defense.defense_bonus
+        defense_level_name = target_defense.name
+
+        # Loop invariants
+        attack_name = attack_info.name
+        target_names = ', '.join(target_ids[:2]) if target_ids else 'неизвестно'
+        defense_config = self.defense_config
+        now = time.time()
+        
+        # Applicable defenses and their effectiveness for this sophistication level,
+        # with the success roll and detection-time jitter drawn for all of them at once
+        applicable = APPLICABLE_DEFENSES.get((attack_type, sophistication), ())
+        rolls = (self._rng.random(len(applicable)) * 100).tolist()
+        jitters = self._rng.uniform(-0.02, 0.05, len(applicable)).tolist()
+        for (defense_key, base_effectiveness, defense_info), roll, jitter in zip(applicable, rolls, jitters):
+            config = defense_config[defense_key]
+            if not config["enabled"]:
                 continue
             
-            # Get defense effectiveness for this sophistication level
-            base_effectiveness = defense_info["effectiveness"].get(sophistication, 50)
-            defense_strength = self.defense_config[defense_key]["strength"]
-            
-            # Boost effectiveness based on target vehicle defense level
-            defense_level_bonus = DEFENSE_LEVELS.get(avg_defense, DEFENSE_LEVELS["medium"])["defense_bonus"]
+            defense_strength = config["strength"]
             adjusted_effectiveness = base_effectiveness * (defense_strength / 100.0) * defense_level_bonus
             adjusted_effectiveness = min(adjusted_effectiveness, 99)  # Cap at 99%
             
             # Roll for defense success
-            defense_success = random.random() * 100 < adjusted_effectiveness
+            defense_success = roll < adjusted_effectiveness
             
             # Create defense log with SPECIFIC details
-            defense_id = f"def_{uuid.uuid4().hex[:8]}"
-            target_names = ', '.join(target_ids[:2]) if target_ids else 'неизвестно'
-            defense_level_name = DEFENSE_LEVELS.get(avg_defense, DEFENSE_LEVELS["medium"])["name"]
+            defense_id = f"def_{next(self._log_seq):08x}"
             
             if defense_success:
-                action_taken = f"✓ {defense_info['name']} заблокировала {attack_info['name']} на {target_names} (защита: {defense_level_name}, эффективность: {adjusted_effectiveness:.0f}%)"
+                action_taken = f"✓ {defense_info.name} заблокировала {attack_name} на {target_names} (защита: {defense_level_name}, эффективность: {adjusted_effectiveness:.0f}%)"
                 defenses_succeeded.append(defense_key)
             else:
-                action_taken = f"✗ {defense_info['name']} не смогла остановить {attack_info['name']} — уровень атаки ({sophistication}) превышает защиту {target_names} ({defense_level_name})"
+                action_taken = f"✗ {defense_info.name} не смогла остановить {attack_name} — уровень атаки ({sophistication}) превышает защиту {target_names} ({defense_level_name})"
             
             defense_log = DefenseLog(
                 id=defense_id,
-                timestamp=time.time(),
+                timestamp=now,
                 defense_type=defense_key,
                 attack_id=attack_log.id,
                 attacker_id=attack_log.attacker_id,
                 action_taken=action_taken,
                 success=defense_success,
-                detection_time=defense_info["detection_time"] + random.uniform(-0.02, 0.05),
+                detection_time=defense_info.detection_time + jitter,
                 confidence=adjusted_effectiveness / 100.0,
-                explanation=defense_info["educational_notes"],
-                icon=defense_info["icon"]
+                explanation=defense_info.educational_notes,
+                icon=defense_info.icon
             )
             
             defense_logs_created.append(defense_log)
@@ -784,21 +1266,22 @@ class SimulationEngine:
         attack_log.status = "blocked" if attack_blocked else "succeeded"
         
         # Create outcome log
-        outcome_id = f"out_{uuid.uuid4().hex[:8]}"
+        outcome_id = f"out_{next(self._log_seq):08x}"
         
         # Build dynamic outcome text with real vehicle/defense data
         target_ids = attack_log.target_ids
-        target_vehicles = [v for v in self.vehicles if v["id"] in target_ids]
+        target_vehicles = self._vehicles_by_ids(target_ids)
         target_list_str = ', '.join(target_ids[:3]) if target_ids else 'нет целей'
-        attack_name = ATTACK_TYPES.get(attack_log.attack_type, {}).get('name', attack_log.attack_type)
-        defenses_used = [DEFENSE_TYPES[d.defense_type]['name'] for d in defense_logs if d.success]
-        defenses_failed = [DEFENSE_TYPES[d.defense_type]['name'] for d in defense_logs if not d.success]
+        attack_spec = ATTACK_TYPES.get(attack_log.attack_type)
+        attack_name = attack_spec.name if attack_spec else attack_log.attack_type
+        defenses_used = [DEFENSE_TYPES[d.defense_type].name for d in defense_logs if d.success]
+        defenses_failed = [DEFENSE_TYPES[d.defense_type].name for d in defense_logs if not d.success]
         
         if attack_blocked:
             result = "blocked"
             impact_description = f"{attack_name} на {target_list_str} заблокирована. Сработали: {', '.join(defenses_used[:3])}. Транспортные средства не пострадали."
             if target_vehicles:
-                dl = DEFENSE_LEVELS.get(target_vehicles[0].get('defense_level', 'medium'), DEFENSE_LEVELS['medium'])['name']
+                dl = DEFENSE_LEVELS.get(target_vehicles[0].get('defense_level', 'medium'), DEFENSE_LEVELS['medium']).name
                 learning_points = f"Уровень защиты целей ({dl}) оказался достаточным против атаки уровня '{attack_log.sophistication}'. {len(defenses_used)} из {len(defense_logs)} защит сработали успешно."
             else:
                 learning_points = f"Многоуровневая защита ({len(defenses_used)} механизмов) остановила атаку."
@@ -806,7 +1289,7 @@ class SimulationEngine:
             result = "full_success"
             impact_description = f"{attack_name} прошла на {target_list_str}. Не сработали: {', '.join(defenses_failed[:3])}. Автомобили могли получить ложные данные."
             if target_vehicles:
-                dl = DEFENSE_LEVELS.get(target_vehicles[0].get('defense_level', 'medium'), DEFENSE_LEVELS['medium'])['name']
+                dl = DEFENSE_LEVELS.get(target_vehicles[0].get('defense_level', 'medium'), DEFENSE_LEVELS['medium']).name
                 learning_points = f"Уровень атаки '{attack_log.sophistication}' превысил защиту ({dl}). {len(defenses_failed)} из {len(defense_logs)} защит не справились. Рекомендуется повысить уровень защиты."
             else:
                 learning_points = f"Атака уровня '{attack_log.sophistication}' прошла мимо {len(defenses_failed)} защитных механизмов."
@@ -839,74 +1322,82 @@ class SimulationEngine:
                 self.defense_config[defense_type]["strength"] = max(0, min(100, strength))
 
 
-    def get_current_state(self):
-        road_data = {
-            "nodes": {n: self.road_graph.nodes[n]["pos"] for n in self.road_graph.nodes},
-            "edges": list(self.road_graph.edges),
-            "lights": self.traffic_lights
+    def get_static_metadata(self):
+        """Attack/defense catalog and road geometry for the frontend; neither
+        changes at runtime (reset keeps the same network), so they are sent
+        once per connection instead of with every state"""
+        return {
+            "available_attacks": ATTACK_PRESENTATION,
+            "available_defenses": DEFENSE_PRESENTATION,
+            "road_network": {"nodes": self._node_pos, "edges": self._edge_list},
         }
+
+    def _vehicles_payload(self):
+        internal = VEHICLE_INTERNAL_FIELDS
+        lats = np.round(self._lat, WIRE_COORD_DECIMALS).tolist()
+        lons = np.round(self._lon, WIRE_COORD_DECIMALS).tolist()
+        payload = []
+        for v, lat, lon in zip(self.vehicles, lats, lons):
+            wire = {k: val for k, val in v.items() if k not in internal}
+            wire["lat"] = lat
+            wire["lon"] = lon
+            wire["heading"] = round(v["heading"], WIRE_HEADING_DECIMALS)
+            payload.append(wire)
+        return payload
+
+    def get_current_state(self):
+        # Only the lights change; geometry goes out with the static metadata
+        road_data = {"lights": self._lights_payload()}
         return {
             "step": self.step_count,
-            "vehicles": self.vehicles,
+            "vehicles": self._vehicles_payload(),
             "messages": [],
             "v2v_communications": self.v2v_messages,
+            "v2v_count": self.v2v_count,
             "anomalies": self.anomaly_detections,
             "active_attack": self.active_attack,
-            "params": self.params,
+            "params": self._params_payload,
             "bounds": self.bounds,
             "roads": road_data,
             # NEW: Attack/Defense Educational Logs
-            "attack_logs": [log.to_dict() for log in self.attack_logs[-20:]],  # Last 20
-            "defense_logs": [log.to_dict() for log in self.defense_logs[-20:]],  # Last 20
-            "outcome_logs": [log.to_dict() for log in self.outcome_logs[-10:]],  # Last 10
+            # Log records go out as dataclass instances: orjson encodes them
+            # natively and the msgpack encoder falls back to to_dict()
+            "attack_logs": _recent(self.attack_logs, 20),  # Last 20
+            "defense_logs": _recent(self.defense_logs, 20),  # Last 20
+            "outcome_logs": _recent(self.outcome_logs, 10),  # Last 10
             "active_attacks_count": len(self.active_attacks),
             "defense_config": self.defense_config,
             "attack_sophistication": self.attack_sophistication,
-            # Metadata for frontend
-            "available_attacks": {k: {
-                "name": v["name"],
-                "icon": v["icon"],
-                "severity": v["severity"],
-                "description": v["description"]
-            } for k, v in ATTACK_TYPES.items()},
-            "available_defenses": {k: {
-                "name": v["name"],
-                "icon": v["icon"],
-                "type": v["type"],
-                "description": v["description"]
-            } for k, v in DEFENSE_TYPES.items()}
         }
 
     def step(self):
         self.step_count += 1
-        messages = []
-        self.v2v_messages = []
         new_anomalies = []
         
         # Update Traffic Lights (every 100 steps ~ 10 seconds)
-        for node, light in self.traffic_lights.items():
-            light["timer"] += 1
-            if light["timer"] > 100:
-                light["timer"] = 0
-                light["state"] = "green" if light["state"] == "red" else "red"
+        self._update_traffic_lights()
         
-        # Process active attacks: resolve and re-trigger for continuous journal entries
-        for attack_id in list(self.active_attacks.keys()):
-            attack_state = self.active_attacks[attack_id]
-            if "resolution_step" in attack_state and self.step_count >= attack_state["resolution_step"]:
-                self.resolve_attack(attack_id)
-                # Re-trigger a new attack if the attack type is still active
-                if self.active_attack:
-                    attackers = [v for v in self.vehicles if v.get("is_attacker", False)]
-                    for attacker in attackers[:1]:
-                        new_id = self.initiate_attack(self.active_attack, attacker["id"], self.attack_sophistication)
-                        if new_id:
-                            new_state = self.active_attacks[new_id]
-                            new_state["resolution_step"] = self.step_count + random.randint(40, 80)
-                            new_state["repeat_interval"] = random.randint(40, 80)
-
-        # Update vehicle positions
-        for v in self.vehicles:
+        # Process active attacks: resolve and re-trigger for continuous journal entries.
+        # Most steps nothing is due, so only due ids are collected (resolving
+        # and re-triggering mutate active_attacks)
+        due = [
+            attack_id for attack_id, attack_state in self.active_attacks.items()
+            if attack_state.get("resolution_step", math.inf) <= self.step_count
+        ]
+        for attack_id in due:
+            self.resolve_attack(attack_id)
+            # Re-trigger a new attack if the attack type is still active
+            if self.active_attack:
+                attacker = self._lead_attacker()
+                if attacker is not None:
+                    new_id = self.initiate_attack(self.active_attack, attacker["id"], self.attack_sophistication)
+                    if new_id:
+                        new_state = self.active_attacks[new_id]
+                        new_state["resolution_step"] = self.step_count + random.randint(40, 80)
+                        new_state["repeat_interval"] = random.randint(40, 80)
+
+        # Hacker logic and recovery, in vehicle order
+        for idx, v in enumerate(self.vehicles):
             if v["status"] == "stopped":
                 continue
                 
@@ -918,32 +1409,30 @@ class SimulationEngine:
 
                 # Find target (only if no cooldown)
                 if not v["target_vehicle"] and v.get("hack_cooldown", 0) <= 0:
-                    nearby = []
-                    for target in self.vehicles:
-                        if not target["is_attacker"] and target["status"] == "moving":
-                            dist = self._distance(v, target)
-                            if dist < self.params["communication_range"]:
-                                nearby.append(target)
+                    in_range = self._spatial_grid().query(idx, self.params.communication_range)
+                    nearby = in_range[self._moving[in_range] & ~self._is_attacker[in_range]].tolist()
                     if nearby:
-                        v["target_vehicle"] = random.choice(nearby)["id"]
+                        v["target_vehicle"] = self.vehicles[random.choice(nearby)]["id"]
                         v["hack_progress"] = 0.0
                 
                 # Hack target — speed depends on attack sophistication vs target defense level
                 if v["target_vehicle"]:
-                    target = next((t for t in self.vehicles if t["id"] == v["target_vehicle"]), None)
+                    target_idx = self._vehicle_index.get(v["target_vehicle"])
+                    target = None if target_idx is None else self.vehicles[target_idx]
                     if target and target["status"] == "moving":
-                        dist = self._distance(v, target)
-                        if dist < self.params["communication_range"] * 1.2:
+                        d_lat = v["lat"] - target["lat"]
+                        d_lon = v["lon"] - target["lon"]
+                        if d_lat * d_lat + d_lon * d_lon < self._hack_range_sq:
                             # Calculate hack speed based on attack sophistication vs defense level
                             attack_mult = ATTACK_SPEED_MULTIPLIERS.get(self.attack_sophistication, 1.0)
-                            defense_info = DEFENSE_LEVELS.get(target.get("defense_level", "medium"), DEFENSE_LEVELS["medium"])
-                            defense_mult = defense_info["hack_multiplier"]
+                            defense_info = self._defense_specs[target_idx]
+                            defense_mult = defense_info.hack_multiplier
                             hack_speed = 1.5 * attack_mult / max(defense_mult, 0.1)
                             
                             v["hack_progress"] += hack_speed
                             
                             # High-defense vehicles can resist hacking entirely
-                            resist_chance = defense_info["resist_chance"]
+                            resist_chance = defense_info.resist_chance
                             if v["hack_progress"] > 70 and resist_chance > 0 and random.random() < resist_chance * 0.05:
                                 # Defense kicked in — reset hack with cooldown
                                 v["target_vehicle"] = None
@@ -955,11 +1444,12 @@ class SimulationEngine:
                                     "timestamp": time.time(),
                                     "sender": v["id"],
                                     "type": self.active_attack,
-                                    "reason": f"Атака ОТРАЖЕНА защитой ({defense_info['name']})",
+                                    "reason": f"Атака ОТРАЖЕНА защитой ({defense_info.name})",
                                     "severity": "medium"
                                 })
                             elif v["hack_progress"] >= 100:
                                 target["status"] = "stopped"
+                                self._moving[target_idx] = False
                                 target["speed"] = 0
                                 target["hack_recovery_timer"] = 50  # Will recover after ~5 seconds
                                 target["anomalies_detected"] = target.get("anomalies_detected", 0) + 1
@@ -972,7 +1462,7 @@ class SimulationEngine:
                                     "timestamp": time.time(),
                                     "sender": v["id"],
                                     "type": self.active_attack,
-                                    "reason": f"Автомобиль {target['id']} ВЗЛОМАН (защита: {defense_lvl['name']})",
+                                    "reason": f"Автомобиль {target['id']} ВЗЛОМАН (защита: {defense_lvl.name})",
                                     "severity": "high"
                                 })
                         else:
@@ -993,32 +1483,28 @@ class SimulationEngine:
                     if v["hack_recovery_timer"] <= 0:
                         v["status"] = "moving"
                         v["hack_recovery_timer"] = 0
+                        self._moving[idx] = True
+
+        # Movement Logic: vehicles stopped by the hacker above sit this step out
+        active = [v for v in self.vehicles if v["status"] != "stopped"]
+        self._move_vehicles(np.flatnonzero(self._moving))
 
-            # Movement Logic
-            if v["status"] == "moving":
-                self._move_vehicle(v)
-
-            # Generate V2X Message
-            if self.step_count % int(10 / self.params["message_frequency"]) == 0:
-                msg = {
-                    "id": f"msg_{self.step_count}_{v['id']}",
-                    "sender_id": v["id"],
-                    "type": "BSM",
-                    "timestamp": time.time(),
-                    "lat": v["lat"],
-                    "lon": v["lon"],
-                    "speed": v["speed"],
-                    "heading": v["heading"]
-                }
-                messages.append(msg)
+        # Generate V2X Message
+        if self.step_count % self._bsm_interval == 0:
+            # One round of BSMs goes out on a single tick and shares its timestamp.
+            # Nothing downstream reads individual BSMs, so only the per-vehicle
+            # counters and the anomaly check see them
+            sent_at = time.time()
+            for v in active:
                 v["messages_sent"] = v.get("messages_sent", 0) + 1
-                
-                is_anomaly, reason = self._detect_anomaly(msg)
-                if is_anomaly:
+
+            speeds = np.fromiter((v["speed"] for v in active), dtype=np.float64, count=len(active))
+            for v, reason in zip(active, self._detect_anomalies(speeds, sent_at)):
+                if reason is not None:
                     v["anomalies_detected"] = v.get("anomalies_detected", 0) + 1
                     new_anomalies.append({
                         "id": f"a_{self.step_count}_{v['id']}",
-                        "timestamp": time.time(),
+                        "timestamp": sent_at,
                         "sender": v["id"],
                         "type": self.active_attack if v["is_attacker"] else "unknown",
                         "reason": reason,
@@ -1026,151 +1512,146 @@ class SimulationEngine:
                     })
 
         # V2V Communication
-        for i, v1 in enumerate(self.vehicles):
-            for v2 in self.vehicles[i+1:]:
-                dist = self._distance(v1, v2)
-                if dist < self.params["communication_range"]:
-                    self.v2v_messages.append({
-                        "from": v1["id"],
-                        "to": v2["id"],
-                        "type": "BSM",
-                        "distance": dist
-                    })
-                    v1["messages_received"] += 1
-                    v2["messages_received"] += 1
+        if self.step_count % V2V_STRIDE == 0:
+            self._update_v2v()
 
         self.anomaly_detections = new_anomalies[-10:]
 
-        road_data = {
-            "nodes": {n: self.road_graph.nodes[n]["pos"] for n in self.road_graph.nodes},
-            "edges": list(self.road_graph.edges),
-            "lights": self.traffic_lights
-        }
+        # Only the lights change; geometry goes out with the static metadata
+        road_data = {"lights": self._lights_payload()}
 
         return {
             "step": self.step_count,
-            "vehicles": self.vehicles,
-            "messages": messages,
+            "vehicles": self._vehicles_payload(),
+            "messages": [],
             "v2v_communications": self.v2v_messages,
+            "v2v_count": self.v2v_count,
             "anomalies": self.anomaly_detections,
             "active_attack": self.active_attack,
-            "params": self.params,
+            "params": self._params_payload,
             "bounds": self.bounds,
             "roads": road_data,
             # NEW: Attack/Defense Educational Logs (CRITICAL FOR FRONTEND)
-            "attack_logs": [log.to_dict() for log in self.attack_logs[-20:]],  # Last 20
-            "defense_logs": [log.to_dict() for log in self.defense_logs[-20:]],  # Last 20
-            "outcome_logs": [log.to_dict() for log in self.outcome_logs[-10:]],  # Last 10
+            "attack_logs": _recent(self.attack_logs, 20),  # Last 20
+            "defense_logs": _recent(self.defense_logs, 20),  # Last 20
+            "outcome_logs": _recent(self.outcome_logs, 10),  # Last 10
             "active_attacks_count": len(self.active_attacks),
             "defense_config": self.defense_config,
             "attack_sophistication": self.attack_sophistication,
-            # Metadata for frontend
-            "available_attacks": {k: {
-                "name": v["name"],
-                "icon": v["icon"],
-                "severity": v["severity"],
-                "description": v["description"]
-            } for k, v in ATTACK_TYPES.items()},
-            "available_defenses": {k: {
-                "name": v["name"],
-                "icon": v["icon"],
-                "type": v["type"],
-                "description": v["description"]
-            } for k, v in DEFENSE_TYPES.items()}
         }
 
-    def _move_vehicle(self, v):
-        # Check Traffic Light at current target node
-        if v["progress"] > 0.8: # Approaching intersection
-            if v["target_node"] in self.traffic_lights:
-                light = self.traffic_lights[v["target_node"]]
-                if light["state"] == "red":
-                    v["waiting_at_light"] = True
-                    return # Stop moving
-        
-        v["waiting_at_light"] = False
+    def _update_v2v(self):
+        """Rebuild the V2V links between vehicles in range and credit their receipts"""
+        pairs_i, pairs_j, pair_dist = self._spatial_grid().pairs()
+        self.v2v_count = len(pairs_i)
+        report_i, report_j, report_dist = pairs_i, pairs_j, pair_dist
+        if self.v2v_count > V2V_REPORT_LIMIT:
+            # Keep the closest links, still in pair order
+            keep = np.sort(np.argpartition(pair_dist, V2V_REPORT_LIMIT - 1)[:V2V_REPORT_LIMIT])
+            report_i, report_j, report_dist = pairs_i[keep], pairs_j[keep], pair_dist[keep]
+        self.v2v_messages = [{
+            "from": self.vehicles[i]["id"],
+            "to": self.vehicles[j]["id"],
+            "type": "BSM",
+            "distance": dist
+        } for i, j, dist in zip(report_i.tolist(), report_j.tolist(), np.round(report_dist, WIRE_COORD_DECIMALS).tolist())]
+        # Every link counts towards the receipts, itemised or not
+        received = np.bincount(np.concatenate((pairs_i, pairs_j)), minlength=len(self.vehicles)) * V2V_STRIDE
+        for idx in np.flatnonzero(received).tolist():
+            self.vehicles[idx]["messages_received"] += int(received[idx])
 
-        # Get current edge coordinates
-        start_pos = self.road_graph.nodes[v["current_node"]]["pos"]
-        end_pos = self.road_graph.nodes[v["target_node"]]["pos"]
-        
-        edge_dist = math.sqrt((end_pos[0] - start_pos[0])**2 + (end_pos[1] - start_pos[1])**2)
-        
-        speed_kmh = v["max_speed"] * 0.6
-        speed_deg_per_sec = (speed_kmh / 111) / 3600
-        
-        move_dist = speed_deg_per_sec * 0.1 * self.params["global_speed_multiplier"]
-        
-        v["speed"] = speed_kmh
+    def _move_vehicles(self, indices):
+        """Advance the given moving vehicles along their current edges in one pass"""
+        # Vehicles approaching a red light at their target node hold position
+        waiting = (self._progress[indices] > 0.8) & self._red_at_node[self._target_slot[indices]]
+        for idx, wait in zip(indices.tolist(), waiting.tolist()):
+            self.vehicles[idx]["waiting_at_light"] = wait
+        movers = indices[~waiting]
+        if not len(movers):
+            return
+
+        speed_kmh = self._cruise_kmh[movers]
+        current, target = self._current_slot[movers], self._target_slot[movers]
+        heading = self._edge_heading[current, target]
+        progress, pos = _advance_along_edges(
+            np.take(self._node_xy, current, axis=0),
+            self._edge_delta[current, target],
+            self._edge_length[current, target],
+            self._progress[movers],
+            speed_kmh,
+            self.params.global_speed_multiplier,
+        )
+        self._progress[movers] = progress
+        self._lat[movers] = pos[:, 0]
+        self._lon[movers] = pos[:, 1]
+
+        slot = self._node_slot
+        for idx, speed, prog, (lat, lon), hdg in zip(
+            movers.tolist(), speed_kmh.tolist(), progress.tolist(), pos.tolist(), heading.tolist()
+        ):
+            v = self.vehicles[idx]
+            v["speed"] = speed
+            if prog >= 1.0:
+                self._arrive_at_node(v)
+                self._moving[idx] = v["status"] == "moving"
+                self._progress[idx] = 0.0
+                self._lat[idx] = v["lat"]
+                self._lon[idx] = v["lon"]
+                self._current_slot[idx] = slot[v["current_node"]]
+                self._target_slot[idx] = slot[v["target_node"]]
+            else:
+                v["progress"] = prog
+                v["lat"] = lat
+                v["lon"] = lon
+                v["heading"] = hdg
+        self._grid = None
+
+    def _arrive_at_node(self, v):
+        """Snap a vehicle onto its target node and pick the next edge"""
+        end_pos = self._node_pos[v["target_node"]]
+        v["current_node"] = v["target_node"]
+        v["lat"] = end_pos[0]
+        v["lon"] = end_pos[1]
+        v["progress"] = 0.0
         
-        if edge_dist > 0:
-            step_progress = move_dist / edge_dist
-            v["progress"] += step_progress
+        # Check if reached destination
+        if v["current_node"] == v["destination"]:
+            v["status"] = "arrived"
+            v["destination"] = random.choice(self._node_list)
+            v["path"] = self._get_path(v["current_node"], v["destination"])
+            v["path_idx"] = 0
+            if len(v["path"]) > 1:
+                v["target_node"] = v["path"][1]
+                v["status"] = "moving"
         else:
-            v["progress"] = 1.0
-        
-        # Update position
-        if v["progress"] >= 1.0:
-            # Reached target node
-            v["current_node"] = v["target_node"]
-            v["lat"] = end_pos[0]
-            v["lon"] = end_pos[1]
-            v["progress"] = 0.0
-            
-            # Check if reached destination
-            if v["current_node"] == v["destination"]:
-                v["status"] = "arrived"
-                nodes = list(self.road_graph.nodes())
-                v["destination"] = random.choice(nodes)
-                v["path"] = self._get_path(v["current_node"], v["destination"])
-                if len(v["path"]) > 1:
-                    v["target_node"] = v["path"][1]
-                    v["status"] = "moving"
+            # Advance the path cursor; anything off-path gets a fresh route
+            path, current_idx = v["path"], v.get("path_idx", 0) + 1
+            if current_idx + 1 < len(path) and path[current_idx] == v["current_node"]:
+                v["path_idx"] = current_idx
+                v["target_node"] = path[current_idx + 1]
             else:
-                try:
-                    current_idx = v["path"].index(v["current_node"])
-                    if current_idx + 1 < len(v["path"]):
-                        v["target_node"] = v["path"][current_idx + 1]
-                    else:
-                        v["path"] = self._get_path(v["current_node"], v["destination"])
-                        v["target_node"] = v["path"][1] if len(v["path"]) > 1 else v["current_node"]
-                except ValueError:
-                     v["path"] = self._get_path(v["current_node"], v["destination"])
-                     v["target_node"] = v["path"][1] if len(v["path"]) > 1 else v["current_node"]
-                     
-            # Update heading
-            new_end_pos = self.road_graph.nodes[v["target_node"]]["pos"]
-            dy = new_end_pos[0] - v["lat"]
-            dx = new_end_pos[1] - v["lon"]
-            v["heading"] = math.degrees(math.atan2(dx, dy)) % 360
-            
-        else:
-            v["lat"] = start_pos[0] + (end_pos[0] - start_pos[0]) * v["progress"]
-            v["lon"] = start_pos[1] + (end_pos[1] - start_pos[1]) * v["progress"]
-            
-            dy = end_pos[0] - start_pos[0]
-            dx = end_pos[1] - start_pos[1]
-            v["heading"] = math.degrees(math.atan2(dx, dy)) % 360
-
-    def _detect_anomaly(self, msg):
-        is_anomaly = False
-        reason = None
-        sensitivity = self.params.get("detection_sensitivity", 0.7)
-        
-        # Speed threshold scales with sensitivity (higher sensitivity = lower threshold)
-        speed_threshold = 200 - (sensitivity * 80)  # Range: 144-200 km/h
-        if msg["speed"] > speed_threshold:
-            is_anomaly = True
-            reason = f"Impossible speed: {msg['speed']:.0f} km/h (threshold: {speed_threshold:.0f})"
-        
-        # Timestamp freshness scales with sensitivity
-        time_threshold = 10 - (sensitivity * 6)  # Range: 4-10 seconds
-        if msg["timestamp"] < time.time() - time_threshold:
-            is_anomaly = True
-            reason = f"Replayed message (older than {time_threshold:.0f}s)"
-            
-        return is_anomaly, reason
+                self._reroute(v)
+                 
+        # Update heading: the vehicle sits on its current node, so it is the new edge's
+        v["heading"] = float(self._edge_heading[self._node_slot[v["current_node"]], self._node_slot[v["target_node"]]])
+
+    def _reroute(self, v):
+        """Route a vehicle from its current node to its destination"""
+        key = (v["current_node"], v["destination"])
+        v["path"] = self._get_path(*key)
+        v["path_idx"] = 0
+        v["target_node"] = self._next_hop.get(key, v["current_node"])
 
-    def _distance(self, v1, v2):
-        return math.sqrt((v1["lat"] - v2["lat"])**2 + (v1["lon"] - v2["lon"])**2)
+    def _detect_anomalies(self, speeds, sent_at):
+        """Check one BSM round at once; returns the anomaly reason per message, None if clean.
+
+        speeds holds each message's reported speed, sent_at the round's shared timestamp.
+        """
+        # The whole round has one timestamp, so freshness is a single comparison
+        if sent_at < time.time() - self._time_threshold:
+            return [f"Replayed message (older than {self._time_threshold:.0f}s)"] * len(speeds)
 
+        reasons = [None] * len(speeds)
+        for k in np.flatnonzero(speeds > self._speed_threshold).tolist():
+            reasons[k] = f"Impossible speed: {speeds[k]:.0f} km/h (threshold: {self._speed_threshold:.0f})"
+        return reasons
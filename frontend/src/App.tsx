@@ -1,7 +1,7 @@
 import { clsx } from 'clsx'
 import { Activity, AlertTriangle, ChevronLeft, ChevronRight, HelpCircle, Pause, Play, RotateCcw, Settings, Shield, X, Zap, BookOpen } from 'lucide-react'
 import { useEffect, useRef, useState, useCallback, useMemo } from 'react'
-import MapView from './MapView'
+import MapView, { RoadNetwork } from './MapView'
 import { useTranslation, Lang } from './i18n'
 import { DynamicContainer } from './components/DynamicContainer'
 
@@ -37,11 +37,12 @@ interface SimulationState {
   vehicles: Vehicle[]
   messages: unknown[]
   v2v_communications: { from: string; to: string; type: string; distance: number }[]
+  v2v_count?: number
   anomalies: { id: string; timestamp: number; sender: string; type: string; reason: string; severity: string }[]
   active_attack: string | null
   params: { global_speed_multiplier: number; message_frequency: number; detection_sensitivity: number; communication_range: number }
   bounds: { lat_min: number; lat_max: number; lon_min: number; lon_max: number }
-  roads: { nodes: Record<string, [number, number]>; edges: [string, string][]; lights?: Record<string, { state: string; timer: number }> }
+  roads: { lights?: Record<string, { state: string; timer: number }> }
   attack_logs?: AttackLog[]
   defense_logs?: DefenseLog[]
   outcome_logs?: AttackOutcome[]
@@ -49,10 +50,12 @@ interface SimulationState {
   attack_sophistication?: string
   available_attacks?: Record<string, { name: string; icon: string; severity: string; description: string }>
   available_defenses?: Record<string, { name: string; icon: string; type: string; description: string }>
+  road_network?: RoadNetwork
 }
 
 const API_BASE = `${window.location.origin}/api`
 const WS_URL = `${window.location.protocol === 'https:' ? 'wss:' : 'ws:'}//${window.location.host}/api/ws`
+const frameDecoder = new TextDecoder()
 
 const VEHICLE_ICON: Record<string, string> = {
   passenger: '🚗', truck: '🚛', bus: '🚌', emergency: '🚑', hacker: '💀',
@@ -65,6 +68,7 @@ const ATTACK_I18N: Record<string, string> = {
 function App() {
   const [connected, setConnected] = useState(false)
   const [sim, setSim] = useState<SimulationState | null>(null)
+  const [roadNetwork, setRoadNetwork] = useState<RoadNetwork | null>(null)
   const [running, setRunning] = useState(false)
   const [selectedVehicle, setSelectedVehicle] = useState<Vehicle | null>(null)
   const [showWelcome, setShowWelcome] = useState(true)
@@ -108,6 +112,7 @@ function App() {
 
   function connect() {
     const ws = new WebSocket(WS_URL)
+    ws.binaryType = 'arraybuffer'
     ws.onopen = () => { setConnected(true); reconnRef.current = 0 }
     ws.onclose = () => {
       setConnected(false)
@@ -117,11 +122,20 @@ function App() {
     ws.onerror = () => {}
     ws.onmessage = (e) => {
       try {
-        const data: SimulationState = JSON.parse(e.data)
-        // Cache metadata from first message
-        if (data.available_attacks) metadataRef.current.available_attacks = data.available_attacks
-        if (data.available_defenses) metadataRef.current.available_defenses = data.available_defenses
-        latestRef.current = data
+        // Backend sends orjson-encoded binary frames
+        const text = typeof e.data === 'string' ? e.data : frameDecoder.decode(e.data)
+        const payload: SimulationState | SimulationState[] = JSON.parse(text)
+        // Batched connections (?batch=N) receive an array of consecutive steps
+        const frames = Array.isArray(payload) ? payload : [payload]
+        for (const data of frames) {
+          // Cache metadata from the catalog frame sent right after connect
+          if (data.available_attacks) metadataRef.current.available_attacks = data.available_attacks
+          if (data.available_defenses) metadataRef.current.available_defenses = data.available_defenses
+          if (data.road_network) setRoadNetwork(data.road_network)
+        }
+        const states = frames.filter(f => f.vehicles)
+        if (!states.length) return
+        latestRef.current = states[states.length - 1]
         if (!throttleRef.current) {
           throttleRef.current = setTimeout(() => {
             if (latestRef.current) setSim(latestRef.current)
@@ -228,7 +242,7 @@ function App() {
 
       {/* MAP */}
       <div className="absolute inset-0 z-0">
-        <MapView simulationState={sim} selectedVehicle={selectedVehicle} onSelectVehicle={setSelectedVehicle} lang={lang} />
+        <MapView simulationState={sim} roadNetwork={roadNetwork} selectedVehicle={selectedVehicle} onSelectVehicle={setSelectedVehicle} lang={lang} />
       </div>
 
       {/* TOP BAR — narrator + status */}
@@ -378,7 +392,7 @@ function App() {
             {[
               { label: t('stats.vehicles'), val: sim?.vehicles.length || 0 },
               { label: t('stats.step'), val: sim?.step || 0 },
-              { label: t('stats.v2v'), val: sim?.v2v_communications?.length || 0 },
+              { label: t('stats.v2v'), val: sim?.v2v_count ?? sim?.v2v_communications?.length ?? 0 },
             ].map(s => (
               <div key={s.label} className="bg-slate-800/50 p-2 rounded border border-slate-700 text-center">
                 <div className="text-[10px] text-slate-500">{s.label}</div>
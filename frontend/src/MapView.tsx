@@ -29,12 +29,16 @@ interface Vehicle {
   defense_level?: string
 }
 
+// Static road geometry, sent once per connection with the catalog frame
+export interface RoadNetwork {
+  nodes: Record<string, [number, number]>
+  edges: [string, string][]
+}
+
 interface SimulationState {
   vehicles: Vehicle[]
   bounds: { lat_min: number; lat_max: number; lon_min: number; lon_max: number }
   roads: {
-    nodes: Record<string, [number, number]>
-    edges: [string, string][]
     lights?: Record<string, { state: string; timer: number }>
   }
   active_attack: string | null
@@ -46,6 +50,7 @@ interface SimulationState {
 
 interface MapViewProps {
   simulationState: SimulationState | null
+  roadNetwork: RoadNetwork | null
   selectedVehicle: Vehicle | null
   onSelectVehicle: (v: Vehicle | null) => void
   lang?: Lang
@@ -212,17 +217,17 @@ function FitBounds({ bounds }: { bounds: SimulationState['bounds'] }) {
 }
 
 // ===== MAIN =====
-export default function MapView({ simulationState, selectedVehicle, onSelectVehicle, lang = 'ru' }: MapViewProps) {
+export default function MapView({ simulationState, roadNetwork, selectedVehicle, onSelectVehicle, lang = 'ru' }: MapViewProps) {
   const mapRef = useRef<L.Map | null>(null)
   const { t } = useTranslation(lang)
 
   // Road edges (memoized — only changes if road network changes)
   const roadSegments = useMemo(() => {
-    if (!simulationState?.roads) return []
+    if (!roadNetwork) return []
     const seen = new Set<string>()
     const segs: [number, number][][] = []
-    const nodes = simulationState.roads.nodes
-    for (const [a, b] of simulationState.roads.edges) {
+    const nodes = roadNetwork.nodes
+    for (const [a, b] of roadNetwork.edges) {
       const k = [a, b].sort().join('--')
       if (seen.has(k)) continue
       seen.add(k)
@@ -230,18 +235,18 @@ export default function MapView({ simulationState, selectedVehicle, onSelectVehi
       if (pA && pB) segs.push([[pA[0], pA[1]], [pB[0], pB[1]]])
     }
     return segs
-  }, [simulationState?.roads])
+  }, [roadNetwork])
 
   // Intersection dots
   const intersections = useMemo(() => {
-    if (!simulationState?.roads) return []
+    if (!roadNetwork) return []
     const counts = new Map<string, number>()
-    for (const [a, b] of simulationState.roads.edges) {
+    for (const [a, b] of roadNetwork.edges) {
       counts.set(a, (counts.get(a) || 0) + 1)
       counts.set(b, (counts.get(b) || 0) + 1)
     }
     const result: [number, number][] = []
-    const nodes = simulationState.roads.nodes
+    const nodes = roadNetwork.nodes
     for (const [id, c] of counts) {
       if (c >= 3) {
         const pos = nodes[id]
@@ -249,19 +254,19 @@ export default function MapView({ simulationState, selectedVehicle, onSelectVehi
       }
     }
     return result
-  }, [simulationState?.roads])
+  }, [roadNetwork])
 
   // Selected vehicle path
   const selectedPath = useMemo(() => {
-    if (!selectedVehicle?.path || !simulationState?.roads) return null
-    const nodes = simulationState.roads.nodes
+    if (!selectedVehicle?.path || !roadNetwork) return null
+    const nodes = roadNetwork.nodes
     const pts: [number, number][] = []
     for (const id of selectedVehicle.path) {
       const pos = nodes[id]
       if (pos) pts.push([pos[0], pos[1]])
     }
     return pts.length > 1 ? pts : null
-  }, [selectedVehicle?.path, simulationState?.roads])
+  }, [selectedVehicle?.path, roadNetwork])
 
   // Attack line
   const attackLine = useMemo(() => {
@@ -365,8 +370,8 @@ export default function MapView({ simulationState, selectedVehicle, onSelectVehi
         )}
 
         {/* Traffic lights */}
-        {simulationState.roads?.lights && Object.entries(simulationState.roads.lights).map(([id, light]) => {
-          const pos = simulationState.roads.nodes[id]
+        {roadNetwork && simulationState.roads?.lights && Object.entries(simulationState.roads.lights).map(([id, light]) => {
+          const pos = roadNetwork.nodes[id]
           if (!pos) return null
           return <Marker key={`l${id}`} position={[pos[0], pos[1]]} icon={getLightIcon(light.state)} />
         })}
@@ -6,7 +6,7 @@ SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" && pwd )"
 
 # Start backend in background
 echo "Starting backend on http://localhost:8000 ..."
-cd "$SCRIPT_DIR/backend" && python3 -m uvicorn main:app --reload --host 0.0.0.0 --port 8000 &
+cd "$SCRIPT_DIR" && python3 -m uvicorn backend.main:app --reload --host 0.0.0.0 --port 8000 --loop uvloop --http httptools --ws websockets --ws-per-message-deflate true &
 BACKEND_PID=$!
 
 # Start frontend
@@ -0,0 +1,58 @@
+import socket
+import threading
+import time
+import unittest
+
+import uvicorn
+from websockets.sync.client import connect
+
+from backend import main
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+class BroadcasterLifecycleTest(unittest.TestCase):
+    """Runs the app on a real uvicorn server: the test client cancels the
+    handler on close, which would hide a handler that never notices the
+    socket going away"""
+
+    @classmethod
+    def setUpClass(cls):
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        cls.url = "ws://127.0.0.1:%d/ws" % sock.getsockname()[1]
+        cls.server = uvicorn.Server(uvicorn.Config(main.app, log_level="warning"))
+        cls.thread = threading.Thread(target=cls.server.run, kwargs={"sockets": [sock]}, daemon=True)
+        cls.thread.start()
+        assert wait_for(lambda: cls.server.started)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.should_exit = True
+        cls.thread.join(5)
+
+    def setUp(self):
+        main.simulation.stop()
+
+    def test_paused_disconnect_stops_producer(self):
+        with connect(self.url) as ws:
+            ws.recv()  # static catalog
+            ws.recv()  # first state
+            ws.recv()  # the producer's idle state; later ones are deduplicated
+            self.assertTrue(wait_for(lambda: main.broadcaster.task is not None))
+            producer = main.broadcaster.task
+            self.assertEqual(len(main.broadcaster.subscribers), 1)
+        self.assertTrue(wait_for(lambda: not main.broadcaster.subscribers))
+        self.assertTrue(wait_for(producer.done))
+        self.assertIsNone(main.broadcaster.task)
+
+
+if __name__ == "__main__":
+    unittest.main()